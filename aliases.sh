@@ -32,6 +32,9 @@ alias hfsync='python /root/autodl-tmp/comfyui-autodl-env/setup_models.py'
 # 快速登录
 alias hflogin="hf auth login"
 
+# 对等模型缓存：将本机 shared_models 只读共享给同内网的其它实例 (对方设置 MODEL_PEERS="http://<本机内网IP>:8765")
+alias peerserve='python /root/autodl-tmp/comfyui-autodl-env/download/peer_cache.py --bind "$(hostname -I | awk "{print \$1}")" --port 8765'
+
 
 # --- 离线同步工具 ---
 # 仅执行同步逻辑，不关闭机器
@@ -1,6 +1,12 @@
 #!/usr/bin/env python3
 # download/download_manager.py
+import time
+
+# 启动计时起点：必须早于其余 import，才能覆盖 CLI 自身的导入开销
+_T0 = time.perf_counter()
+
 import os
+import sys
 import yaml
 import argparse
 
@@ -10,8 +16,11 @@ import argparse
 os.environ["HF_HUB_ENABLE_HF_TRANSFER"] = "1"
 os.environ["HF_HUB_DISABLE_PROGRESS_BARS"] = "0"
 
-from strategies.url_strategy import UrlStrategy
-from strategies.hf_strategy import HfStrategy
+# 共享工具模块 (tracing.py) 位于仓库根目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tracing
+from strategies import registry
 
 # ==========================================
 # 基础路径配置
@@ -20,12 +29,10 @@ ENV_REPO_DIR = os.getenv("ENV_REPO_DIR", "/root/autodl-tmp/comfyui-autodl-env")
 EXTRA_MODEL_PATHS = os.path.join(ENV_REPO_DIR, "extra_model_paths.yaml")
 PRESETS_FILE = os.path.join(ENV_REPO_DIR, "model_presets.yaml")
 
-# 策略路由注册表
-STRATEGY_MAP = {
-    'url': UrlStrategy(),
-    'hf': HfStrategy(),
-    'hf_snapshot': HfStrategy()
-}
+# 启动阶段不应出现的重型依赖，出现即视为导入回退
+HEAVY_MODULES = ("huggingface_hub", "hf_transfer")
+
+_T_IMPORTED = time.perf_counter()
 
 def get_target_path(target_key: str) -> str:
     """解析 extra_model_paths.yaml 获取物理目录"""
@@ -39,15 +46,21 @@ def get_target_path(target_key: str) -> str:
         print(f"    [WARN] 解析路径映射失败，回退至默认路径: {e}")
         return f"/root/autodl-tmp/shared_models/{target_key}"
 
+def load_presets_config() -> dict:
+    """读取预设清单，并登记其中 strategies 段落声明的插件策略 (name: "module:Class")"""
+    with open(PRESETS_FILE, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    registry.discover_plugins(config.get('strategies'))
+    return config
+
 def run_preset(preset_name: str):
     """解析 YAML 预设并分发任务给具体的 Strategy"""
     if not os.path.exists(PRESETS_FILE):
         print(f"ERROR: 找不到预设清单文件 {PRESETS_FILE}")
         return
 
-    with open(PRESETS_FILE, 'r') as f:
-        all_presets = yaml.safe_load(f).get('presets', {})
-    
+    all_presets = load_presets_config().get('presets', {})
+
     items = all_presets.get(preset_name)
     if not items:
         print(f"ERROR: 未定义预设 '{preset_name}'")
@@ -64,8 +77,12 @@ def run_preset(preset_name: str):
         # 2. 解析物理路径
         target_dir = get_target_path(target_key)
         
-        # 3. 策略路由
-        strategy = STRATEGY_MAP.get(dl_type, STRATEGY_MAP['url'])
+        # 3. 策略路由 (按需导入，未登记类型回退至 url)
+        try:
+            strategy = registry.get_strategy(dl_type, default='url')
+        except Exception as e:
+            print(f"    [ERROR] 加载下载策略 '{dl_type}' 失败，已跳过 {source}: {e}")
+            continue
         
         # 4. 执行生命周期 (此时的 **item 仅包含 file, rename, allow_patterns 等扩展参数)
         strategy.execute(
@@ -76,6 +93,33 @@ def run_preset(preset_name: str):
             
     print(f">>> 预设 {preset_name} 执行完毕。")
 
+def report_startup_time():
+    """打印 CLI 启动与各策略的导入耗时，用于发现导入回退"""
+    print(f">>> 模块导入耗时: {(_T_IMPORTED - _T0) * 1000:.1f} ms")
+    print(f">>> 参数解析完成: {(time.perf_counter() - _T0) * 1000:.1f} ms")
+
+    eager = [m for m in HEAVY_MODULES if m in sys.modules]
+    if eager:
+        print(f"    [WARN] 启动阶段已导入重型依赖: {', '.join(eager)}")
+
+    # 每个策略在独立的解释器中冷启动导入，互不共享已加载的模块
+    registry.discover_plugins()
+    for name, result, error in registry.measure_load_times(HEAVY_MODULES):
+        if error:
+            print(f"    [{name}] 策略导入: FAILED ({error})")
+            continue
+        line = f"    [{name}] 策略导入: {result['import_ms']:.1f} ms"
+        if result['skip_ms'] is not None:
+            line += f" | 至跳过判定: {result['skip_ms']:.1f} ms"
+        else:
+            line += " | 无跳过路径"
+        print(line)
+        # 未真正下载却已加载重型依赖，说明导入未被推迟到 _do_download
+        if result['heavy']:
+            print(f"    [WARN] [{name}] 加载/跳过判定阶段已导入重型依赖: {', '.join(result['heavy'])}")
+            eager.append(name)
+    return 1 if eager else 0
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="AutoDL 满血版模型下载管理器 (策略模式版)")
     
@@ -90,16 +134,32 @@ if __name__ == "__main__":
     # 全局参数
     parser.add_argument("--target", default="checkpoints", help="目标目录在 YAML 中的映射名 (默认: checkpoints)")
     parser.add_argument("--allow", nargs='+', help="快照模式下的白名单过滤 (例: *.safetensors)")
+    parser.add_argument("--peers", nargs='+', metavar='URL', help="优先查询的对等缓存节点 (覆盖 MODEL_PEERS)，例: http://10.0.0.2:8765")
+
+    # 诊断
+    parser.add_argument("--list-strategies", action="store_true", help="列出已登记的下载策略 (不触发导入)")
+    parser.add_argument("--startup-time", action="store_true", help="测量 CLI 启动与各策略的导入耗时")
 
     args = parser.parse_args()
 
-    if args.preset:
-        run_preset(args.preset)
+    if args.peers:
+        os.environ["MODEL_PEERS"] = ",".join(args.peers)
+
+    if args.startup_time:
+        sys.exit(report_startup_time())
+    elif args.list_strategies:
+        registry.discover_plugins()
+        if os.path.exists(PRESETS_FILE):
+            load_presets_config()
+        print("\n".join(registry.available_strategies()))
+    elif args.preset:
+        with tracing.span(f"preset:{args.preset}"):
+            run_preset(args.preset)
     elif args.hf:
-        STRATEGY_MAP['hf'].execute(source=args.hf[0], target_dir=get_target_path(args.target), type='hf', file=args.hf[1])
+        registry.get_strategy('hf').execute(source=args.hf[0], target_dir=get_target_path(args.target), type='hf', file=args.hf[1])
     elif args.snapshot:
-        STRATEGY_MAP['hf_snapshot'].execute(source=args.snapshot, target_dir=get_target_path(args.target), type='hf_snapshot', allow_patterns=args.allow)
+        registry.get_strategy('hf_snapshot').execute(source=args.snapshot, target_dir=get_target_path(args.target), type='hf_snapshot', allow_patterns=args.allow)
     elif args.url:
-        STRATEGY_MAP['url'].execute(source=args.url[0], target_dir=get_target_path(args.target), type='url')
+        registry.get_strategy('url').execute(source=args.url[0], target_dir=get_target_path(args.target), type='url')
     else:
         parser.print_help()
\ No newline at end of file
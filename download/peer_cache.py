@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# download/peer_cache.py
+# 只读的对等模型缓存服务：将本机 shared_models 目录通过 HTTP 提供给其它实例
+#
+#   python peer_cache.py --bind <本机内网IP> --port 8765
+#   其它实例: MODEL_PEERS="http://<本机内网IP>:8765" python download_manager.py --preset ...
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+import urllib.parse
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# 共享工具模块 (tracing.py) 位于仓库根目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategies import peer
+
+ENV_REPO_DIR = os.getenv("ENV_REPO_DIR", "/root/autodl-tmp/comfyui-autodl-env")
+DEFAULT_ROOT = "/root/autodl-tmp/shared_models"
+COPY_CHUNK = 8 * 1024 * 1024
+
+# 未命中时重新扫描索引的最小间隔，避免无效查询反复遍历目录
+RESCAN_INTERVAL = 5
+
+
+class PeerIndex:
+    """汇总 root 下各目录的 .peer_index.json: key -> {path, size, sha256}"""
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self.entries = {}
+        self.scanned_at = 0
+        self.lock = threading.Lock()
+        self.rescan()
+
+    def rescan(self):
+        entries = {}
+        for dirpath, dirs, files in os.walk(self.root):
+            # 跳过 HF 的 .cache 等隐藏目录
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            if peer.INDEX_NAME not in files:
+                continue
+            rel_dir = os.path.relpath(dirpath, self.root)
+            for key, entry in peer.load_index(dirpath).items():
+                if not peer.is_public_key(key):
+                    continue
+                rel = os.path.normpath(os.path.join(rel_dir, entry['file']))
+                if os.path.isfile(os.path.join(self.root, rel)):
+                    entries[key] = dict(entry, path=rel)
+        with self.lock:
+            self.entries = entries
+            self.scanned_at = time.monotonic()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None and time.monotonic() - self.scanned_at > RESCAN_INTERVAL:
+            self.rescan()
+            entry = self.entries.get(key)
+        return entry
+
+
+class PeerCacheHandler(BaseHTTPRequestHandler):
+    """GET /index, GET /lookup?key=..., GET|HEAD /files/<相对路径> (支持 Range)"""
+    index = None
+    server_version = "AutoDLPeerCache/1.0"
+
+    def log_message(self, fmt, *args):
+        sys.stderr.write(f"    [PEER] {self.address_string()} {fmt % args}\n")
+
+    def _send_json(self, obj, status=HTTPStatus.OK):
+        body = json.dumps(obj, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET(head_only=True)
+
+    def do_GET(self, head_only=False):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/index":
+            self.index.rescan()
+            return self._send_json(self.index.entries)
+        if url.path == "/lookup":
+            key = urllib.parse.parse_qs(url.query).get('key', [''])[0]
+            entry = self.index.get(key)
+            if entry is None:
+                return self._send_json({"error": "miss"}, HTTPStatus.NOT_FOUND)
+            return self._send_json(entry)
+        if url.path.startswith("/files/"):
+            return self._send_file(urllib.parse.unquote(url.path[len("/files/"):]), head_only)
+        self.send_error(HTTPStatus.NOT_FOUND)
+
+    def _send_file(self, rel, head_only):
+        # 防止 ../ 越出共享目录
+        path = os.path.realpath(os.path.join(self.index.root, rel))
+        if not path.startswith(self.index.root + os.sep) or not os.path.isfile(path):
+            return self.send_error(HTTPStatus.NOT_FOUND)
+
+        size = os.path.getsize(path)
+        start, end = 0, size - 1
+        m = re.fullmatch(r'bytes=(\d*)-(\d*)', self.headers.get("Range", ""))
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+            else:
+                start = max(size - int(m.group(2)), 0)
+            if start > end:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(HTTPStatus.OK)
+
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        if head_only:
+            return
+
+        remaining = end - start + 1
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while remaining > 0:
+                chunk = f.read(min(COPY_CHUNK, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+
+
+def get_shared_root() -> str:
+    """从 extra_model_paths.yaml 读取共享模型根目录"""
+    try:
+        import yaml
+        with open(os.path.join(ENV_REPO_DIR, "extra_model_paths.yaml"), 'r') as f:
+            return yaml.safe_load(f)['autodl_shared']['base_path']
+    except Exception:
+        return DEFAULT_ROOT
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AutoDL 对等模型缓存服务 (只读)")
+    parser.add_argument("--root", help="共享的模型根目录 (默认: extra_model_paths.yaml 中的 base_path)")
+    # 默认仅本机可访问；跨实例共享时显式指定内网地址，避免暴露到公网
+    parser.add_argument("--bind", default="127.0.0.1", help="监听地址 (默认: 127.0.0.1，跨实例共享请填写本机内网 IP)")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口 (默认: 8765)")
+    args = parser.parse_args()
+
+    root = args.root or get_shared_root()
+    PeerCacheHandler.index = PeerIndex(root)
+    server = ThreadingHTTPServer((args.bind, args.port), PeerCacheHandler)
+    print(f">>> 对等缓存服务已启动: http://{args.bind}:{args.port} -> {root} ({len(PeerCacheHandler.index.entries)} 条索引)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -3,6 +3,9 @@ from abc import ABC, abstractmethod
 import os
 import logging
 
+import tracing
+from . import peer
+
 # 配置基础日志格式
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("DownloadStrategy")
@@ -12,14 +15,25 @@ class DownloadStrategy(ABC):
         """
         模板方法：接管下载的完整生命周期
         """
+        with tracing.span(f"{type(self).__name__}:{kwargs.get('file') or source}", cat="download",
+                          source=source, target_dir=target_dir, type=kwargs.get('type')) as sp:
+            ok = self._execute(source, target_dir, sp, **kwargs)
+            sp.set(ok=ok)
+            return ok
+
+    def _execute(self, source: str, target_dir: str, sp, **kwargs) -> bool:
         self.source = source
         self.target_dir = target_dir
         self.kwargs = kwargs
         self.filename = kwargs.get('file')
+        # 实例按策略名复用，落地文件名由各策略的 pre_check 重新确定
+        self.final_name = None
 
         # 1. 预检阶段
         if self.pre_check():
             logger.info(f"    [SKIP] 满足跳过条件，无需下载: {self.filename or self.source}")
+            sp.set(skipped=True)
+            self.record_peer_index()
             return True
 
         try:
@@ -29,6 +43,9 @@ class DownloadStrategy(ABC):
             # 3. 后置处理与异常恢复
             if success:
                 self.post_download()
+                self.record_peer_index()
+                if tracing.enabled():
+                    sp.set(bytes=self.downloaded_bytes())
                 return True
             else:
                 logger.warning(f"    [WARN] 下载未成功完成，触发清理逻辑: {self.source}")
@@ -37,9 +54,50 @@ class DownloadStrategy(ABC):
                 
         except Exception as e:
             logger.error(f"    [FATAL] 下载过程发生未捕获异常: {e}")
+            sp.set(error=str(e))
             self.cleanup()
             return False
 
+    def downloaded_bytes(self):
+        """本次下载落地的字节数 (仅追踪开启时统计)；无法确定落地文件 (如快照) 时返回 None"""
+        name = self.final_name or self.filename
+        if not name:
+            return None
+        path = os.path.join(self.target_dir, name)
+        return os.path.getsize(path) if os.path.isfile(path) else None
+
+    def peer_keys(self) -> list:
+        """对等缓存查询键 (见 peer.py)；返回空列表且没有 sha256 时，该任务不参与对等缓存"""
+        return []
+
+    def content_sha256(self):
+        """已落地文件的内容哈希，未知时返回 None"""
+        return self.kwargs.get('sha256')
+
+    def fetch_from_peers(self) -> bool:
+        """优先从 MODEL_PEERS 中的节点拉取，命中返回 True"""
+        keys, sha256 = self.peer_keys(), self.kwargs.get('sha256')
+        if not keys and not sha256:
+            return False
+        entry = peer.fetch(keys, self.target_dir, self.final_name, sha256)
+        if entry and entry.get('sha256'):
+            # fetch 只在内容通过哈希校验后才返回 sha256，可放心登记到本机索引
+            self.kwargs.setdefault('sha256', entry['sha256'])
+        return entry is not None
+
+    def record_peer_index(self) -> None:
+        """登记落地文件，使本机的 peer_cache.py 服务可以提供给其它实例"""
+        name = self.final_name
+        if not name:
+            return
+        keys, sha256 = self.peer_keys(), self.content_sha256()
+        if not keys and not sha256:
+            return
+        try:
+            peer.record(self.target_dir, keys, name, sha256)
+        except OSError as e:
+            logger.warning(f"    [WARN] 写入对等缓存索引失败: {e}")
+
     def pre_check(self) -> bool:
         """
         默认预检逻辑：检查目标文件是否已存在。
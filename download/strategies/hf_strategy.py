@@ -2,8 +2,9 @@
 import os
 import shutil
 from pathlib import Path
+import re
 from .base import DownloadStrategy, logger
-from huggingface_hub import hf_hub_download, snapshot_download
+from . import peer
 
 class HfStrategy(DownloadStrategy):
     def _clear_locks(self):
@@ -38,6 +39,26 @@ class HfStrategy(DownloadStrategy):
             
         return False
 
+    def peer_keys(self) -> list:
+        # 快照模式文件清单未知，不参与对等缓存。
+        # 未固定 commit 时 main 可能已更新，节点上的旧文件照样能通过它自己的哈希校验，
+        # 因此只按 commit 查询；仅填写 sha256 的条目由 peer.py 按内容哈希查询
+        revision = self.kwargs.get('revision')
+        if self.kwargs.get('type', 'hf') == 'hf' and self.filename and peer.is_commit(revision):
+            return [peer.hf_key(self.source, self.filename, revision)]
+        return []
+
+    def content_sha256(self):
+        """优先使用预设或对等拉取时校验过的哈希；否则 LFS 文件的 etag 即 sha256，从 HF 写在 local_dir 下的元数据中读取"""
+        if super().content_sha256():
+            return super().content_sha256()
+        metadata = Path(self.target_dir) / ".cache" / "huggingface" / "download" / f"{self.filename}.metadata"
+        try:
+            etag = metadata.read_text().splitlines()[1].strip()
+        except (OSError, IndexError):
+            return None
+        return etag if re.fullmatch(r'[0-9a-f]{64}', etag) else None
+
     def _do_download(self) -> bool:
         dl_type = self.kwargs.get('type', 'hf')
         os.makedirs(self.target_dir, exist_ok=True)
@@ -47,6 +68,9 @@ class HfStrategy(DownloadStrategy):
             ignore = self.kwargs.get('ignore_patterns')
             logger.info(f"    [HF-REPO] 同步快照: {self.source}")
             
+            # 仅在真正下载时才导入，pre_check 判定跳过的路径不付出 HF 的导入开销
+            from huggingface_hub import snapshot_download
+
             # 【修复 2】移除已被 HF 弃用的参数 (resume_download, local_dir_use_symlinks)
             snapshot_download(
                 repo_id=self.source,
@@ -55,12 +79,16 @@ class HfStrategy(DownloadStrategy):
                 ignore_patterns=ignore,
                 max_workers=16
             )
+        elif self.fetch_from_peers():
+            return True
         else:
             logger.info(f"    [HF-FILE] 同步: {self.source}/{self.filename} -> {self.final_name}")
             
+            from huggingface_hub import hf_hub_download
             returned_path = hf_hub_download(
                 repo_id=self.source,
                 filename=self.filename,
+                revision=self.kwargs.get('revision'),
                 local_dir=self.target_dir
             )
             
@@ -0,0 +1,251 @@
+# download/strategies/peer.py
+import os
+import re
+import json
+import logging
+from pathlib import Path
+
+import tracing
+
+logger = logging.getLogger("DownloadStrategy")
+
+# ==========================================
+# 对等节点模型缓存 (客户端 + 索引)
+# 每个目标目录维护一份 .peer_index.json: key -> {file, size, sha256}
+# key 形如 "hf:<repo>/<file>@<commit>"、"url:<链接>"、"sha256:<内容哈希>"
+# ==========================================
+PEERS_ENV = "MODEL_PEERS"
+INDEX_NAME = ".peer_index.json"
+PART_SUFFIX = ".peer.part"
+CHUNK_SIZE = 8 * 1024 * 1024
+LOOKUP_TIMEOUT = 2
+FETCH_TIMEOUT = 30
+
+
+def configured_peers() -> list:
+    """读取环境变量中的对等节点列表，例: MODEL_PEERS="http://10.0.0.2:8765,http://10.0.0.3:8765" """
+    return [p.strip().rstrip('/') for p in os.getenv(PEERS_ENV, "").split(',') if p.strip()]
+
+
+# 视为凭据的查询参数 (小写比较)，不进入索引，也不暴露给其它实例
+CREDENTIAL_PARAMS = {"token", "api_key", "apikey", "access_token", "auth", "key", "signature", "sig"}
+# 临时签名链接 (如 S3 / CDN 预签名) 的参数前缀
+CREDENTIAL_PREFIXES = ("x-amz-",)
+
+
+def is_commit(revision) -> bool:
+    """完整的 40 位 commit 哈希才算固定版本；main 等分支随时可能更新"""
+    return bool(revision) and re.fullmatch(r'[0-9a-f]{40}', revision) is not None
+
+
+def hf_key(repo: str, filename: str, revision: str) -> str:
+    return f"hf:{repo}/{filename}@{revision}"
+
+
+def _is_credential(param: str) -> bool:
+    param = param.lower()
+    return param in CREDENTIAL_PARAMS or param.startswith(CREDENTIAL_PREFIXES)
+
+
+def url_key(url: str) -> str:
+    """
+    去掉锚点与凭据参数，其余查询参数排序后保留 (同一接口的 ?type=Model / ?type=Config 是不同文件)
+
+    >>> url_key("https://civitai.com/api/download/models/1?type=Model&token=abc")
+    'url:https://civitai.com/api/download/models/1?type=Model'
+    >>> url_key("https://x/m/1?type=Model") == url_key("https://x/m/1?type=Config")
+    False
+    >>> url_key("https://x/m/1?format=SafeTensor&type=Model#a") == url_key("https://x/m/1?type=Model&format=SafeTensor")
+    True
+    >>> url_key("https://x/m.bin?X-Amz-Signature=s&api_key=k")
+    'url:https://x/m.bin'
+    """
+    import urllib.parse
+
+    base, _, query = url.split('#')[0].partition('?')
+    params = sorted((k, v) for k, v in urllib.parse.parse_qsl(query, keep_blank_values=True) if not _is_credential(k))
+    return f"url:{base}?{urllib.parse.urlencode(params)}" if params else f"url:{base}"
+
+
+def is_public_key(key: str) -> bool:
+    """旧版索引中的 hf:...@main 等未固定 commit 的键、带凭据参数的 url 键，不再登记或对外提供"""
+    import urllib.parse
+
+    if key.startswith("hf:"):
+        return is_commit(key.rpartition('@')[2])
+    if not key.startswith("url:") or '?' not in key:
+        return True
+    query = key.split('?', 1)[1]
+    return not any(_is_credential(k) for k, _ in urllib.parse.parse_qsl(query, keep_blank_values=True))
+
+
+# ------------------------------------------
+# 索引读写
+# ------------------------------------------
+def load_index(directory) -> dict:
+    index_file = Path(directory) / INDEX_NAME
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record(directory, keys, filename: str, sha256: str = None) -> None:
+    """登记已落地的文件，供其它实例通过 peer_cache.py 查询"""
+    path = Path(directory) / filename
+    if not path.is_file():
+        return
+    entry = {"file": filename, "size": path.stat().st_size}
+    if sha256:
+        entry["sha256"] = sha256
+        keys = list(keys) + [f"sha256:{sha256}"]
+
+    index = load_index(directory)
+    clean = {k: v for k, v in index.items() if is_public_key(k)}
+    if len(clean) == len(index) and all(index.get(k) == entry for k in keys):
+        return
+    index = clean
+    index.update({k: entry for k in keys})
+
+    # 先写临时文件再替换，避免服务端读到半截 JSON
+    tmp = Path(directory) / f"{INDEX_NAME}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, Path(directory) / INDEX_NAME)
+
+
+# ------------------------------------------
+# 客户端 (urllib / hashlib 按需导入，未配置节点时不付出导入开销)
+# ------------------------------------------
+# 本轮运行中连接失败的节点，不再重复查询，避免每个条目都等待超时
+_dead_peers = set()
+
+
+def lookup(peer: str, key: str):
+    """向单个节点查询 key，命中返回条目 (含 path)；未命中返回 None，节点不可达时标记为失效"""
+    import urllib.error
+    import urllib.parse
+    import urllib.request
+
+    url = f"{peer}/lookup?{urllib.parse.urlencode({'key': key})}"
+    try:
+        with urllib.request.urlopen(url, timeout=LOOKUP_TIMEOUT) as resp:
+            return json.load(resp)
+    except urllib.error.HTTPError:
+        return None
+    except Exception as e:
+        logger.warning(f"    [WARN] 对等节点不可达，本轮跳过 ({peer}): {e}")
+        _dead_peers.add(peer)
+        return None
+
+
+def _download(peer: str, entry: dict, part: Path) -> None:
+    """从节点拉取文件，已有 .peer.part 时通过 Range 续传 (调用方保证 offset < size)"""
+    import urllib.parse
+    import urllib.request
+
+    offset = part.stat().st_size if part.exists() else 0
+    url = f"{peer}/files/{urllib.parse.quote(entry['path'])}"
+    req = urllib.request.Request(url)
+    if offset:
+        req.add_header("Range", f"bytes={offset}-")
+
+    with urllib.request.urlopen(req, timeout=FETCH_TIMEOUT) as resp:
+        # 节点不支持 Range 时返回完整内容，从头覆盖
+        mode = 'ab' if offset and resp.status == 206 else 'wb'
+        with open(part, mode) as f:
+            while True:
+                chunk = resp.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+
+
+def _sha256(path: Path) -> str:
+    import hashlib
+
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _prepare_part(part: Path, size: int, expected_hash: str) -> None:
+    """无法用哈希校验的残留不续传；超长的残留无效，一律从头下载"""
+    if part.exists() and (not expected_hash or part.stat().st_size > size):
+        part.unlink()
+
+
+def _verified(part: Path, entry: dict, expected_hash: str) -> bool:
+    if part.stat().st_size != entry['size']:
+        return False
+    return not expected_hash or _sha256(part) == expected_hash
+
+
+def _fetch_from(peer: str, entry: dict, part: Path, expected_hash: str) -> bool:
+    """从单个节点拉取并校验；续传结果校验失败时丢弃残留，从头重下一次"""
+    _prepare_part(part, entry['size'], expected_hash)
+    resumed = part.exists()
+    # 已完整的残留 (替换前中断) 直接进入校验，避免 Range 越界 416
+    if not resumed or part.stat().st_size < entry['size']:
+        _download(peer, entry, part)
+    if _verified(part, entry, expected_hash):
+        return True
+
+    part.unlink(missing_ok=True)
+    if resumed:
+        logger.warning(f"    [WARN] 续传结果校验失败，从头重新拉取: {peer}")
+        _download(peer, entry, part)
+        if _verified(part, entry, expected_hash):
+            return True
+        part.unlink(missing_ok=True)
+    return False
+
+
+def fetch(keys, target_dir: str, final_name: str, sha256: str = None):
+    """
+    依次向已配置的节点查询 keys 并拉取到 target_dir/final_name。
+    命中返回节点条目 (仅当内容通过哈希校验时才带 sha256)，全部未命中或失败返回 None (调用方回退至上游)。
+    """
+    peers = [p for p in configured_peers() if p not in _dead_peers]
+    if not peers:
+        return None
+
+    keys = ([f"sha256:{sha256}"] if sha256 else []) + list(keys)
+    final = Path(target_dir) / final_name
+    part = Path(target_dir) / f"{final_name}{PART_SUFFIX}"
+
+    for peer in peers:
+        entry = None
+        for key in keys:
+            entry = lookup(peer, key)
+            if entry or peer in _dead_peers:
+                break
+        if not entry:
+            continue
+
+        expected_hash = sha256 or entry.get('sha256')
+        logger.info(f"    [PEER] 命中对等缓存: {peer} -> {final_name} ({entry['size'] / 1024**3:.2f} GB)")
+        with tracing.span(f"peer:{final_name}", cat="download", peer=peer, path=entry['path']) as sp:
+            os.makedirs(target_dir, exist_ok=True)
+            try:
+                ok = _fetch_from(peer, entry, part, expected_hash)
+            except Exception as e:
+                # 保留 .peer.part：带哈希时本轮后续节点可续传，全部节点失败后才丢弃
+                logger.warning(f"    [WARN] 对等节点传输中断 ({peer}): {e}")
+                continue
+            if not ok:
+                logger.warning(f"    [WARN] 对等缓存校验失败，丢弃: {peer}")
+                continue
+            sp.set(bytes=entry['size'])
+
+        os.replace(part, final)
+        entry = dict(entry)
+        if expected_hash:
+            entry['sha256'] = expected_hash
+        return entry
+
+    part.unlink(missing_ok=True)
+    return None
@@ -0,0 +1,129 @@
+# download/strategies/registry.py
+import os
+import sys
+import json
+import importlib
+import logging
+import subprocess
+
+logger = logging.getLogger("DownloadStrategy")
+
+# ==========================================
+# 策略注册表：name -> "模块路径:类名"
+# 只登记字符串，首次使用时才 import，避免 --url / --help 也要付出 huggingface_hub 的导入开销
+# 以 "." 开头的模块路径相对于本包 (strategies) 解析
+# ==========================================
+BUILTIN_STRATEGIES = {
+    'url': '.url_strategy:UrlStrategy',
+    'hf': '.hf_strategy:HfStrategy',
+    'hf_snapshot': '.hf_strategy:HfStrategy',
+}
+
+# 插件策略声明入口，格式: "civitai=my_plugins.civitai:CivitaiStrategy,modelscope=..."
+PLUGIN_ENV = "DOWNLOAD_STRATEGY_PLUGINS"
+
+_specs = dict(BUILTIN_STRATEGIES)
+_instances = {}
+
+
+def register_strategy(name: str, spec: str) -> None:
+    """按名称登记策略 (仅记录 "模块:类名"，不触发导入)"""
+    if ':' not in spec:
+        raise ValueError(f"策略声明格式错误 (应为 module:Class): {name}={spec}")
+    _specs[name] = spec
+    _instances.pop(name, None)
+
+
+def discover_plugins(extra: dict = None) -> None:
+    """从环境变量与预设文件的 strategies 段落发现插件策略"""
+    for entry in os.getenv(PLUGIN_ENV, "").split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, _, spec = entry.partition('=')
+        try:
+            register_strategy(name.strip(), spec.strip())
+        except ValueError as e:
+            logger.warning(f"    [WARN] {e}")
+
+    for name, spec in (extra or {}).items():
+        try:
+            register_strategy(str(name), str(spec))
+        except ValueError as e:
+            logger.warning(f"    [WARN] {e}")
+
+
+def available_strategies() -> list:
+    """已登记的策略名称 (不会导入任何策略模块)"""
+    return sorted(_specs)
+
+
+def load_strategy_class(name: str):
+    """解析声明并导入策略类"""
+    spec = _specs[name]
+    module_path, _, class_name = spec.partition(':')
+    module = importlib.import_module(module_path, package=__package__)
+    return getattr(module, class_name)
+
+
+def get_strategy(name: str, default: str = None):
+    """获取策略实例；未登记的类型回退至 default，实例按名称缓存"""
+    if name not in _specs:
+        if default is None:
+            raise KeyError(f"未登记的下载策略: {name}")
+        name = default
+
+    if name not in _instances:
+        _instances[name] = load_strategy_class(name)()
+    return _instances[name]
+
+
+# 在子进程中执行的计时脚本：argv = [包所在目录, 仓库根目录, 策略名, "模块:类名", 是否探测跳过路径, 重型模块列表]
+# 跳过路径探测：在临时目录放一个已存在的目标文件，计时 "实例化 + pre_check"，不会触发任何下载
+_IMPORT_PROBE = """
+import os, sys, json, time, tempfile
+sys.path[:0] = sys.argv[1:3]
+start = time.perf_counter()
+import importlib
+module_path, _, class_name = sys.argv[4].partition(':')
+cls = getattr(importlib.import_module(module_path, package='strategies'), class_name)
+result = {'import_ms': (time.perf_counter() - start) * 1000, 'skip_ms': None}
+if sys.argv[5] == '1':
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['HF_HOME'] = tmp
+        open(os.path.join(tmp, 'probe.bin'), 'wb').close()
+        strategy = cls()
+        strategy.source, strategy.target_dir, strategy.filename = 'probe/probe.bin', tmp, 'probe.bin'
+        strategy.kwargs = {'type': sys.argv[3], 'file': 'probe.bin'}
+        skipped = strategy.pre_check()
+    if skipped:
+        result['skip_ms'] = (time.perf_counter() - start) * 1000
+result['heavy'] = [m for m in sys.argv[6].split(',') if m and m in sys.modules]
+print(json.dumps(result))
+"""
+
+
+def measure_load_times(heavy_modules=()) -> list:
+    """
+    在全新解释器中逐个导入已登记的策略并记录耗时 (ms)，避免共享模块掩盖导入回退。
+    内置策略额外计时 "导入 + 实例化 + pre_check 判定跳过" 的完整路径，即逐文件调用 CLI 的真实开销。
+    返回 [(name, 结果字典 或 None, 错误信息)]
+    """
+    pkg_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    repo_root = os.path.dirname(pkg_parent)
+
+    results = []
+    for name in available_strategies():
+        # 插件的 pre_check 可能访问网络，只探测内置策略的跳过路径
+        probe_skip = '1' if _specs[name] == BUILTIN_STRATEGIES.get(name) else '0'
+        res = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE, pkg_parent, repo_root,
+             name, _specs[name], probe_skip, ",".join(heavy_modules)],
+            capture_output=True, text=True
+        )
+        if res.returncode == 0:
+            results.append((name, json.loads(res.stdout.strip().splitlines()[-1]), None))
+        else:
+            lines = res.stderr.strip().splitlines()
+            results.append((name, None, lines[-1] if lines else f"exit {res.returncode}"))
+    return results
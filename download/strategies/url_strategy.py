@@ -3,6 +3,8 @@ import os
 import subprocess
 from pathlib import Path
 from .base import DownloadStrategy, logger
+from . import peer
+import tracing
 
 class UrlStrategy(DownloadStrategy):
     def pre_check(self) -> bool:
@@ -17,8 +19,16 @@ class UrlStrategy(DownloadStrategy):
             return True
         return False
 
+    def peer_keys(self) -> list:
+        return [peer.url_key(self.source)]
+
     def _do_download(self) -> bool:
         os.makedirs(self.target_dir, exist_ok=True)
+        if self.fetch_from_peers():
+            # 之前中断的 aria2 控制文件会让 pre_check 认为文件未完成，每次都重新拉取
+            (Path(self.target_dir) / f"{self.final_name}.aria2").unlink(missing_ok=True)
+            return True
+
         logger.info(f"    [URL] 启动 Aria2 下载: {self.final_name}")
         
         cmd = [
@@ -27,11 +37,13 @@ class UrlStrategy(DownloadStrategy):
             "-d", self.target_dir, "-o", self.final_name, self.source
         ]
         
-        subprocess.run(cmd, check=True)
+        with tracing.span("aria2c", cat="cmd", argv=cmd) as sp:
+            res = subprocess.run(cmd, check=True)
+            sp.set(exit_code=res.returncode)
         return True
 
     def cleanup(self) -> None:
-        if hasattr(self, 'final_name'):
+        if self.final_name:
             aria_file = Path(self.target_dir) / f"{self.final_name}.aria2"
             if aria_file.exists():
                 logger.info(f"    [CLEANUP] 移除中断的进度文件: {aria_file.name}")
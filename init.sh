@@ -30,13 +30,33 @@ export PIP_CACHE_DIR="$NEW_CACHE_DIR/pip"
 export HF_HOME="$NEW_CACHE_DIR/huggingface"
 export TORCH_HOME="$NEW_CACHE_DIR/torch"
 
+# 可选耗时追踪：设置 AUTODL_TRACE=<目录> 后各阶段记录为 Chrome trace 事件
+# 用法: trace_run NAME [--bytes PATH | --bytes-before PATH] -- CMD ...；未开启时直接执行 CMD
+trace_run() {
+    if [ -n "${AUTODL_TRACE:-}" ] && [ -f "$ENV_REPO_DIR/tracing.py" ]; then
+        "$PYTHON_BIN" "$ENV_REPO_DIR/tracing.py" run "$@"
+    else
+        while [ "$#" -gt 0 ] && [ "$1" != "--" ]; do shift; done
+        shift
+        "$@"
+    fi
+}
+export -f trace_run
+
+# 追踪目录位于持久化数据盘：每次装配使用独立子目录，合并时不会混入历史启动的事件
+if [ -n "${AUTODL_TRACE:-}" ]; then
+    export AUTODL_TRACE="$AUTODL_TRACE/boot-$(date +%Y%m%d-%H%M%S)"
+    mkdir -p "$AUTODL_TRACE"
+    echo ">>> 耗时追踪已开启: $AUTODL_TRACE"
+fi
+
 echo ">>> 开始执行模块化装配 (主控调度模式)..."
 
 # ------------------------------------------
 # 模块 A: 缓存迁移与兜底 (调用子脚本)
 # ------------------------------------------
 if [ -f "$ENV_REPO_DIR/setup_cache.sh" ]; then
-    bash "$ENV_REPO_DIR/setup_cache.sh"
+    trace_run "setup_cache.sh" -- bash "$ENV_REPO_DIR/setup_cache.sh"
 else
     echo "ERROR: 未找到 setup_cache.sh，装配中止。" >&2
     exit 1
@@ -46,7 +66,7 @@ fi
 # 模块 B: 核心引擎部署 (调用子脚本)
 # ------------------------------------------
 if [ -f "$ENV_REPO_DIR/setup_engine.sh" ]; then
-    bash "$ENV_REPO_DIR/setup_engine.sh"
+    trace_run "setup_engine.sh" -- bash "$ENV_REPO_DIR/setup_engine.sh"
 else
     echo "ERROR: 未找到 setup_engine.sh，装配中止。" >&2
     exit 1
@@ -70,7 +90,7 @@ ln -sf "$ENV_REPO_DIR/workflows" "$COMFYUI_DIR/user_workflows"
 # 执行模型目录构建与分类对齐
 if [ -f "$ENV_REPO_DIR/setup_models.py" ]; then
     export YAML_PATH="$ENV_REPO_DIR/extra_model_paths.yaml"
-    "$PYTHON_BIN" "$ENV_REPO_DIR/setup_models.py"
+    trace_run "setup_models.py" -- "$PYTHON_BIN" "$ENV_REPO_DIR/setup_models.py"
 else
     echo "    -> ERROR: 未找到 setup_models.py" >&2
 fi
@@ -85,7 +105,7 @@ if [ -f "$ENV_REPO_DIR/setup_nodes.py" ]; then
     export PYTHON_BIN="$PYTHON_BIN"
     
     # 必须追加 --init 触发路由
-    "$PYTHON_BIN" "$ENV_REPO_DIR/setup_nodes.py" --init
+    trace_run "setup_nodes.py --init" -- "$PYTHON_BIN" "$ENV_REPO_DIR/setup_nodes.py" --init
 else
     echo "    -> 提示: 未找到 setup_nodes.py"
 fi
@@ -188,4 +208,8 @@ EOF
     chmod +x /usr/local/bin/comfy || true
 fi
 
-echo ">>> 装配流程全部完成！全局指令 'comfy' 已就绪。"
\ No newline at end of file
+echo ">>> 装配流程全部完成！全局指令 'comfy' 已就绪。"
+
+if [ -n "${AUTODL_TRACE:-}" ]; then
+    "$PYTHON_BIN" "$ENV_REPO_DIR/tracing.py" merge "$AUTODL_TRACE" || true
+fi
\ No newline at end of file
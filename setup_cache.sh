@@ -6,6 +6,11 @@
 
 set -euo pipefail
 
+# 由 init.sh 导出；单独运行本脚本时退化为直接执行
+if ! declare -F trace_run >/dev/null; then
+    trace_run() { while [ "$#" -gt 0 ] && [ "$1" != "--" ]; do shift; done; shift; "$@"; }
+fi
+
 # 基础目录配置
 OLD_CACHE_BASE="/root/.cache"
 NEW_CACHE_BASE="${NEW_CACHE_DIR:-/root/autodl-tmp/.cache}"
@@ -58,9 +63,9 @@ for CACHE_TYPE in "${CACHE_DIRS[@]}"; do
         
         if $USE_RSYNC; then
             # rsync -a: 归档模式; --remove-source-files: 迁移后删除源文件
-            rsync -a --remove-source-files "$OLD_PATH/" "$NEW_PATH/"
+            trace_run "rsync:$CACHE_TYPE" --bytes-before "$OLD_PATH" -- rsync -a --remove-source-files "$OLD_PATH/" "$NEW_PATH/"
         else
-            cp -a "$OLD_PATH/." "$NEW_PATH/"
+            trace_run "cp:$CACHE_TYPE" --bytes-before "$OLD_PATH" -- cp -a "$OLD_PATH/." "$NEW_PATH/"
         fi
         
         # 清理残余空目录
@@ -7,6 +7,11 @@
 
 set -euo pipefail
 
+# 由 init.sh 导出；单独运行本脚本时退化为直接执行
+if ! declare -F trace_run >/dev/null; then
+    trace_run() { while [ "$#" -gt 0 ] && [ "$1" != "--" ]; do shift; done; shift; "$@"; }
+fi
+
 # 1. 注入路径与永久环境变量
 LOCAL_BIN="/root/.local/bin"
 BASHRC="/root/.bashrc"
@@ -40,7 +45,7 @@ echo "    -> 驱动校验通过: $DRIVER_VERSION"
 # 3. 仓库装配
 echo ">>> [2/6] 校验/克隆 ComfyUI 仓库..."
 if [ ! -d "$COMFYUI_DIR" ]; then
-    git clone https://github.com/comfyanonymous/ComfyUI.git "$COMFYUI_DIR"
+    trace_run "git clone ComfyUI" --bytes "$COMFYUI_DIR" -- git clone https://github.com/comfyanonymous/ComfyUI.git "$COMFYUI_DIR"
 fi
 
 # 4. 工具链纠偏（解决 hf 冲突）
@@ -50,7 +55,7 @@ uv tool uninstall hf || true
 uv tool uninstall huggingface-hub || true
 
 # 通过系统环境安装带 CLI 的官方库，确保 'hf' 命令包含 auth/download/upload
-uv pip install --system -U "huggingface_hub[cli]" hf_transfer
+trace_run "uv pip install huggingface_hub" -- uv pip install --system -U "huggingface_hub[cli]" hf_transfer
 
 # 5. 核心引擎（PyTorch cu130）安装
 cd "$COMFYUI_DIR"
@@ -61,11 +66,11 @@ if "$PYTHON_BIN" -c "$CHECK_CU130" >/dev/null 2>&1; then
     echo "    -> torch (cu130+) 已就绪。"
 else
     echo "    -> 正在升级 PyTorch 至 2.12.0.dev+cu130..."
-    uv pip install --system --upgrade --pre torch torchvision torchaudio --index-url "$DESIRED_TORCH_INDEX"
+    trace_run "uv pip install torch" -- uv pip install --system --upgrade --pre torch torchvision torchaudio --index-url "$DESIRED_TORCH_INDEX"
 fi
 
 # 6. 业务依赖
 echo ">>> [5/6] 安装 ComfyUI 核心依赖..."
-uv pip install --system -r requirements.txt
+trace_run "uv pip install requirements" -- uv pip install --system -r requirements.txt
 
 echo ">>> 引擎部署全部完成！"
\ No newline at end of file
@@ -4,6 +4,8 @@ import yaml
 import pathlib
 import logging
 
+import tracing
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='    %(levelname)s: %(message)s')
 logger = logging.getLogger("model_setup")
@@ -27,6 +29,10 @@ def safe_link(src, dst):
         logger.info(f"逻辑映射: {src_p.name} -> {dst_p.parent.name}/")
 
 def sync_models(yaml_path):
+    with tracing.span("sync_models", yaml=str(yaml_path)):
+        _sync_models(yaml_path)
+
+def _sync_models(yaml_path):
     if not os.path.exists(yaml_path):
         logger.warning(f"未找到配置文件: {yaml_path}")
         return
@@ -40,24 +46,25 @@ def sync_models(yaml_path):
             base_path = os.path.expanduser(details.get('base_path', ''))
             if not base_path: continue
             
-            ensure_dir(base_path)
+            with tracing.span(f"section:{section}", base_path=base_path):
+                ensure_dir(base_path)
 
-            # 1. 初始化 YAML 中定义的所有目录
-            for key, folder in details.items():
-                if key == 'base_path' or not isinstance(folder, str):
-                    continue
-                ensure_dir(os.path.join(base_path, folder.strip('/')))
+                # 1. 初始化 YAML 中定义的所有目录
+                for key, folder in details.items():
+                    if key == 'base_path' or not isinstance(folder, str):
+                        continue
+                    ensure_dir(os.path.join(base_path, folder.strip('/')))
 
-            # 2. 自动分类补全 (解决 GUI 找不到模型的问题)
-            ckpt_dir = pathlib.Path(base_path) / "checkpoints"
-            unet_dir = pathlib.Path(base_path) / "unet"
-            
-            if ckpt_dir.exists() and unet_dir.exists():
-                for model_file in ckpt_dir.glob("*.safetensors"):
-                    name_lower = model_file.name.lower()
-                    # 针对 Flux 或扩散模型自动建立 unet 链接
-                    if "flux" in name_lower or "diffusion" in name_lower:
-                        safe_link(model_file, unet_dir / model_file.name)
+                # 2. 自动分类补全 (解决 GUI 找不到模型的问题)
+                ckpt_dir = pathlib.Path(base_path) / "checkpoints"
+                unet_dir = pathlib.Path(base_path) / "unet"
+                
+                if ckpt_dir.exists() and unet_dir.exists():
+                    for model_file in ckpt_dir.glob("*.safetensors"):
+                        name_lower = model_file.name.lower()
+                        # 针对 Flux 或扩散模型自动建立 unet 链接
+                        if "flux" in name_lower or "diffusion" in name_lower:
+                            safe_link(model_file, unet_dir / model_file.name)
 
     except Exception as e:
         logger.error(f"模型同步异常: {e}")
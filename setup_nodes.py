@@ -5,6 +5,9 @@ import pathlib
 import argparse
 import logging
 import re
+import shutil
+
+import tracing
 
 # ==========================================
 # 视觉与日志配置
@@ -52,13 +55,17 @@ def parse_repo_url(line):
 
 def run_cmd(cmd, cwd=None, check=True, quiet=False):
     """通用的安全指令执行包装器"""
-    try:
-        res = subprocess.run(cmd, cwd=cwd, check=check, capture_output=True, text=True)
-        return True, res.stdout.strip()
-    except subprocess.CalledProcessError as e:
-        if not quiet:
-            log_error(f"指令执行失败: {' '.join(cmd)}\n目录: {cwd}\n错误: {e.stderr.strip()}")
-        return False, e.stderr.strip()
+    argv = [str(c) for c in cmd]
+    with tracing.span(" ".join(argv[:2]), cat="cmd", argv=argv, cwd=str(cwd) if cwd else None) as sp:
+        try:
+            res = subprocess.run(cmd, cwd=cwd, check=check, capture_output=True, text=True)
+            sp.set(exit_code=res.returncode)
+            return True, res.stdout.strip()
+        except subprocess.CalledProcessError as e:
+            sp.set(exit_code=e.returncode)
+            if not quiet:
+                log_error(f"指令执行失败: {' '.join(cmd)}\n目录: {cwd}\n错误: {e.stderr.strip()}")
+            return False, e.stderr.strip()
 
 def get_git_remote(repo_path):
     """获取 Git 仓库的远程地址"""
@@ -89,10 +96,139 @@ def safe_git_pull(repo_path, repo_name):
         if not pop_success:
             log_warn(f"[{repo_name}] 恢复时可能产生冲突，请进入该目录手动解决。")
 
+# ==========================================
+# 裸镜像缓存 (数据盘持久化，新克隆通过 alternates 复用对象)
+# ==========================================
+MANAGER_URL = "https://github.com/ltdrdata/ComfyUI-Manager.git"
+
+def mirror_path_for(url, mirror_dir):
+    """将仓库地址映射为镜像缓存路径: <mirror_dir>/<host>/<owner>/<repo>.git"""
+    m = re.match(r'^(?:https?://(?:[^@/]+@)?|git@)([^/:]+)[/:](.+?)(?:\.git)?/*$', url.strip())
+    if not m:
+        return None
+    return pathlib.Path(mirror_dir) / m.group(1) / f"{m.group(2)}.git"
+
+def iter_mirrors(mirror_dir):
+    """遍历镜像缓存中的所有裸仓库 (不深入仓库内部)"""
+    for root, dirs, _ in os.walk(mirror_dir):
+        if root.endswith(".git") and os.path.exists(os.path.join(root, "HEAD")):
+            dirs.clear()
+            yield pathlib.Path(root)
+
+def iter_leftovers(mirror_dir):
+    """遍历中断重建留下的 *.git.old / *.git.rebuild 目录 (不深入仓库内部)"""
+    for root, dirs, _ in os.walk(mirror_dir):
+        if root.endswith((".git", ".git.old", ".git.rebuild")):
+            dirs.clear()
+            if not root.endswith(".git"):
+                yield pathlib.Path(root)
+
+def mirror_healthy(mirror, full=False):
+    """对象校验：默认仅检查连通性 (快)，full=True 时完整校验对象内容以发现损坏"""
+    cmd = ["git", "fsck", "--no-dangling"] if full else ["git", "fsck", "--connectivity-only"]
+    return run_cmd(cmd, cwd=mirror, quiet=True)[0]
+
+def clone_mirror(url, dest):
+    """建立裸镜像：只跟踪分支与标签，避免 --mirror 连带拉取 refs/pull/* 等全部引用"""
+    if not run_cmd(["git", "clone", "--bare", url, str(dest)])[0]:
+        shutil.rmtree(dest, ignore_errors=True)
+        return False
+    run_cmd(["git", "config", "remote.origin.fetch", "+refs/heads/*:refs/heads/*"], cwd=dest)
+    run_cmd(["git", "config", "--add", "remote.origin.fetch", "+refs/tags/*:refs/tags/*"], cwd=dest)
+    # 节点仓库通过 alternates 借用镜像对象，镜像一旦丢对象就会连带损坏，因此永不过期清理
+    run_cmd(["git", "config", "gc.pruneExpire", "never"], cwd=dest)
+    return True
+
+def recover_mirror(mirror):
+    """重建在替换途中被中断时，将挪开的旧镜像放回原位"""
+    old = mirror.with_name(mirror.name + ".old")
+    if old.exists() and not (mirror / "HEAD").exists():
+        shutil.rmtree(mirror, ignore_errors=True)
+        old.rename(mirror)
+        log_warn(f"[mirror] 已恢复中断重建前的镜像: {mirror.name}")
+
+def rebuild_mirror(mirror, url):
+    """修复路径：重新镜像后替换 (旧镜像先挪开再移入新镜像)，依赖它的节点仓库 alternates 路径保持不变"""
+    log_warn(f"[mirror] 镜像损坏，正在重建: {mirror.name}")
+    tmp = mirror.with_name(mirror.name + ".rebuild")
+    old = mirror.with_name(mirror.name + ".old")
+    shutil.rmtree(tmp, ignore_errors=True)
+    if not clone_mirror(url, tmp):
+        return False
+    shutil.rmtree(old, ignore_errors=True)
+    mirror.rename(old)
+    tmp.rename(mirror)
+    shutil.rmtree(old, ignore_errors=True)
+    return True
+
+def ensure_mirror(url, mirror_dir):
+    """创建或刷新仓库镜像，返回镜像路径；镜像不可用时返回 None (调用方回退为直连克隆)"""
+    if not mirror_dir:
+        return None
+    mirror = mirror_path_for(url, mirror_dir)
+    if mirror is None:
+        return None
+    recover_mirror(mirror)
+
+    if (mirror / "HEAD").exists():
+        if run_cmd(["git", "fetch", "--prune", "origin"], cwd=mirror, quiet=True)[0]:
+            return mirror
+        # 刷新失败可能只是网络问题，镜像完好时仍可作为对象来源
+        if mirror_healthy(mirror):
+            log_warn(f"[mirror] 刷新失败，使用现有镜像: {mirror.name}")
+            return mirror
+        return mirror if rebuild_mirror(mirror, url) else None
+
+    log_info(f"[mirror] 建立镜像缓存: {mirror.name}")
+    mirror.parent.mkdir(parents=True, exist_ok=True)
+    return mirror if clone_mirror(url, mirror) else None
+
+def alternates_file(repo_path):
+    return pathlib.Path(repo_path) / ".git" / "objects" / "info" / "alternates"
+
+def uses_mirror(repo_path, mirror):
+    alt = alternates_file(repo_path)
+    if not alt.exists():
+        return False
+    target = os.path.realpath(mirror / "objects")
+    return any(os.path.realpath(line) == target for line in alt.read_text().split())
+
+def attach_mirror(repo_path, mirror):
+    """为已有节点仓库挂载镜像 alternates，后续 fetch 只需拉取镜像中没有的对象"""
+    if uses_mirror(repo_path, mirror):
+        return
+    alt = alternates_file(repo_path)
+    with open(alt, "a") as f:
+        f.write(f"{mirror / 'objects'}\n")
+
+def dissociate(repo_path):
+    """将借用的对象复制回节点仓库并解除 alternates，使其不再依赖镜像"""
+    if run_cmd(["git", "repack", "-a", "-d", "-q"], cwd=repo_path)[0]:
+        alternates_file(repo_path).unlink(missing_ok=True)
+        return True
+    return False
+
+def clone_node(url, nodes_dir, mirror_dir, dest):
+    """镜像可用时从本地镜像共享克隆 (纯本地 I/O) 再指回远程，否则直连克隆"""
+    mirror = ensure_mirror(url, mirror_dir)
+    if not mirror:
+        return run_cmd(["git", "clone", url, str(dest)], cwd=nodes_dir)[0]
+
+    if not run_cmd(["git", "clone", "--shared", str(mirror), str(dest)], cwd=nodes_dir)[0]:
+        shutil.rmtree(dest, ignore_errors=True)
+        return run_cmd(["git", "clone", url, str(dest)], cwd=nodes_dir)[0]
+    run_cmd(["git", "remote", "set-url", "origin", url], cwd=dest)
+    return True
+
+def node_repos(nodes_dir):
+    if not nodes_dir.exists():
+        return []
+    return [item for item in nodes_dir.iterdir() if item.is_dir() and (item / ".git").exists()]
+
 # ==========================================
 # 业务逻辑路由
 # ==========================================
-def cmd_init(nodes_dir, nodes_list_file, python_bin):
+def cmd_init(nodes_dir, nodes_list_file, python_bin, mirror_dir=None):
     """指令: 根据 custom_nodes.txt 首次克隆并初始化插件"""
     log_title("初始化自定义节点生态")
     nodes_dir.mkdir(parents=True, exist_ok=True)
@@ -101,7 +237,7 @@ def cmd_init(nodes_dir, nodes_list_file, python_bin):
     manager_path = nodes_dir / "ComfyUI-Manager"
     if not manager_path.exists():
         log_info("正在装配核心底座: ComfyUI-Manager...")
-        run_cmd(["git", "clone", "https://github.com/ltdrdata/ComfyUI-Manager.git"], cwd=nodes_dir)
+        clone_node(MANAGER_URL, nodes_dir, mirror_dir, manager_path)
         log_success("ComfyUI-Manager 安装就绪。")
 
     if not nodes_list_file.exists():
@@ -118,26 +254,101 @@ def cmd_init(nodes_dir, nodes_list_file, python_bin):
             
             if not repo_path.exists():
                 log_info(f"拉取新插件: {repo_name} ...")
-                if run_cmd(["git", "clone", url], cwd=nodes_dir)[0]:
-                    req_file = repo_path / "requirements.txt"
-                    if req_file.exists():
-                        log_info(f"正在为 {repo_name} 构建 Python 依赖...")
-                        run_cmd([python_bin, "-m", "pip", "install", "-r", str(req_file)])
-                    log_success(f"插件 {repo_name} 装配成功。")
+                with tracing.span(f"node:{repo_name}", cat="node", url=url) as sp:
+                    if clone_node(url, nodes_dir, mirror_dir, dest=repo_path):
+                        if tracing.enabled():
+                            sp.set(bytes=tracing.path_bytes(repo_path))
+                        req_file = repo_path / "requirements.txt"
+                        if req_file.exists():
+                            log_info(f"正在为 {repo_name} 构建 Python 依赖...")
+                            run_cmd([python_bin, "-m", "pip", "install", "-r", str(req_file)])
+                        log_success(f"插件 {repo_name} 装配成功。")
             else:
                 log_info(f"插件已存在，跳过: {repo_name}")
 
-def cmd_update(nodes_dir):
+def cmd_update(nodes_dir, mirror_dir=None):
     """指令: 安全更新本地所有的自定义节点"""
     log_title("执行节点安全更新策略")
     if not nodes_dir.exists():
         log_error("Custom nodes 目录不存在！")
         return
 
-    for item in nodes_dir.iterdir():
-        if item.is_dir() and (item / ".git").exists():
+    for item in node_repos(nodes_dir):
+        with tracing.span(f"node:{item.name}", cat="node"):
+            # 先刷新镜像，节点仓库的 pull 即可在本地命中绝大部分对象
+            url = get_git_remote(item)
+            mirror = ensure_mirror(url, mirror_dir) if url else None
+            if mirror:
+                attach_mirror(item, mirror)
             safe_git_pull(item, item.name)
 
+def cmd_mirror_prune(nodes_dir, nodes_list_file, mirror_dir):
+    """指令: 清理不再被清单或本地节点引用的镜像，并压缩保留的镜像"""
+    log_title("清理节点镜像缓存")
+    if not mirror_dir or not pathlib.Path(mirror_dir).exists():
+        log_warn("镜像缓存目录不存在，无需清理。")
+        return
+
+    wanted = {mirror_path_for(MANAGER_URL, mirror_dir)}
+    if nodes_list_file.exists():
+        with open(nodes_list_file, "r") as f:
+            for line in f:
+                url, _ = parse_repo_url(line)
+                if url: wanted.add(mirror_path_for(url, mirror_dir))
+    repos = node_repos(nodes_dir)
+    for item in repos:
+        url = get_git_remote(item)
+        if url: wanted.add(mirror_path_for(url, mirror_dir))
+
+    # 中断的重建残留：.old 先尝试放回原位，其余直接删除
+    for leftover in list(iter_leftovers(mirror_dir)):
+        if leftover.suffix == ".old":
+            recover_mirror(leftover.with_suffix(""))
+    for leftover in list(iter_leftovers(mirror_dir)):
+        shutil.rmtree(leftover, ignore_errors=True)
+        log_info(f"[mirror] 已清理重建残留: {leftover.relative_to(mirror_dir)}")
+
+    for mirror in list(iter_mirrors(mirror_dir)):
+        if mirror in wanted:
+            # gc.pruneExpire=never 保证压缩不会删除被节点借用的对象
+            run_cmd(["git", "gc", "--quiet"], cwd=mirror)
+            continue
+
+        dependents = [item for item in repos if uses_mirror(item, mirror)]
+        if not all(dissociate(item) for item in dependents):
+            log_error(f"[mirror] 无法解除依赖，保留镜像: {mirror}")
+            continue
+        shutil.rmtree(mirror, ignore_errors=True)
+        log_success(f"[mirror] 已移除过期镜像: {mirror.relative_to(mirror_dir)}")
+
+def cmd_mirror_repair(nodes_dir, mirror_dir):
+    """指令: 校验镜像与节点仓库的对象完整性，重建损坏的镜像"""
+    log_title("校验并修复节点镜像缓存")
+    if not mirror_dir or not pathlib.Path(mirror_dir).exists():
+        log_warn("镜像缓存目录不存在，无需修复。")
+        return
+
+    for leftover in list(iter_leftovers(mirror_dir)):
+        if leftover.suffix == ".old":
+            recover_mirror(leftover.with_suffix(""))
+
+    for mirror in list(iter_mirrors(mirror_dir)):
+        if mirror_healthy(mirror, full=True):
+            continue
+        _, url = run_cmd(["git", "config", "--get", "remote.origin.url"], cwd=mirror, quiet=True)
+        if not url or not rebuild_mirror(mirror, url):
+            log_error(f"[mirror] 重建失败: {mirror}")
+
+    # 镜像重建后仍缺对象的节点 (如上游已强推删除的提交)，从远程重新拉取全部对象
+    for item in node_repos(nodes_dir):
+        if mirror_healthy(item, full=True):
+            continue
+        log_warn(f"[{item.name}] 对象缺失或损坏，正在从远程重新获取...")
+        if run_cmd(["git", "fetch", "--refetch", "origin"], cwd=item)[0]:
+            log_success(f"[{item.name}] 已修复。")
+        else:
+            log_error(f"[{item.name}] 修复失败，请删除该目录后重新执行 --init。")
+
 def cmd_sync(nodes_dir, env_repo_dir, nodes_list_file):
     """指令: 扫描本地节点 -> 更新配置 -> 严谨提交至 Git"""
     log_title("执行环境清单双向同步")
@@ -202,21 +413,35 @@ if __name__ == "__main__":
     parser.add_argument("--init", action="store_true", help="模式: 依据清单初始化插件生态")
     parser.add_argument("--update", action="store_true", help="模式: 批量安全拉取本地插件的更新")
     parser.add_argument("--sync", action="store_true", help="模式: 扫描本地插件并上传同步至 Git 环境仓库")
+    parser.add_argument("--mirror-prune", action="store_true", help="模式: 清理过期的节点镜像缓存")
+    parser.add_argument("--mirror-repair", action="store_true", help="模式: 校验并修复损坏的节点镜像缓存")
     
     args = parser.parse_args()
 
     COMFY_DIR = os.getenv("COMFYUI_DIR", "/root/autodl-tmp/ComfyUI")
     ENV_REPO_DIR = os.getenv("ENV_REPO_DIR", "/root/autodl-tmp/comfyui-autodl-env")
     PYTHON_BIN = os.getenv("PYTHON_BIN", "python")
+    # 置空 NODE_MIRROR_DIR 可关闭镜像缓存
+    CACHE_DIR = os.getenv("NEW_CACHE_DIR", "/root/autodl-tmp/.cache")
+    MIRROR_DIR = os.getenv("NODE_MIRROR_DIR", os.path.join(CACHE_DIR, "git-mirrors"))
     
     NODES_DIR = pathlib.Path(COMFY_DIR) / "custom_nodes"
     NODES_LIST_FILE = pathlib.Path(ENV_REPO_DIR) / "custom_nodes.txt"
 
     if args.init:
-        cmd_init(NODES_DIR, NODES_LIST_FILE, PYTHON_BIN)
+        with tracing.span("setup_nodes --init"):
+            cmd_init(NODES_DIR, NODES_LIST_FILE, PYTHON_BIN, MIRROR_DIR)
     elif args.update:
-        cmd_update(NODES_DIR)
+        with tracing.span("setup_nodes --update"):
+            cmd_update(NODES_DIR, MIRROR_DIR)
     elif args.sync:
-        cmd_sync(NODES_DIR, ENV_REPO_DIR, NODES_LIST_FILE)
+        with tracing.span("setup_nodes --sync"):
+            cmd_sync(NODES_DIR, ENV_REPO_DIR, NODES_LIST_FILE)
+    elif args.mirror_prune:
+        with tracing.span("setup_nodes --mirror-prune"):
+            cmd_mirror_prune(NODES_DIR, NODES_LIST_FILE, MIRROR_DIR)
+    elif args.mirror_repair:
+        with tracing.span("setup_nodes --mirror-repair"):
+            cmd_mirror_repair(NODES_DIR, MIRROR_DIR)
     else:
         parser.print_help()
\ No newline at end of file
@@ -3,6 +3,8 @@ import subprocess
 import datetime
 import logging
 
+import tracing
+
 # 配置日志格式
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("sync_engine")
@@ -13,12 +15,15 @@ PYTHON_BIN = "python"
 
 def run_cmd(cmd, cwd=None):
     """安全执行 shell 指令"""
-    try:
-        subprocess.run(cmd, cwd=cwd, check=True, capture_output=True, text=True)
-        return True
-    except subprocess.CalledProcessError as e:
-        logger.error(f"失败: {' '.join(cmd)}\n{e.stderr.strip()}")
-        return False
+    with tracing.span(" ".join(cmd[:2]), cat="cmd", argv=cmd, cwd=cwd) as sp:
+        try:
+            subprocess.run(cmd, cwd=cwd, check=True, capture_output=True, text=True)
+            sp.set(exit_code=0)
+            return True
+        except subprocess.CalledProcessError as e:
+            sp.set(exit_code=e.returncode)
+            logger.error(f"失败: {' '.join(cmd)}\n{e.stderr.strip()}")
+            return False
 
 def main():
     logger.info("\n" + "="*40)
@@ -60,4 +65,5 @@ def main():
             logger.error("❌ [ERROR] Commit 失败。")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with tracing.span("shutdown"):
+        main()
\ No newline at end of file
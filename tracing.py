@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# tracing.py - 装配流程耗时追踪 (Chrome trace-event 格式)
+#
+# 设置 AUTODL_TRACE=<目录> 后启用：每个进程退出时写出 trace-<进程名>-<pid>.json，
+# 再用 `python tracing.py merge <目录>` 合并为单个文件，拖入 chrome://tracing 或 ui.perfetto.dev 查看。
+# merge 只读取该目录顶层的 trace-*.json；init.sh 为每次装配创建独立的 boot-<时间戳> 子目录。
+# 未设置时 span() 直接返回共享的空对象，开销可忽略。
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import threading
+import subprocess
+
+TRACE_ENV = "AUTODL_TRACE"
+
+_trace_dir = os.getenv(TRACE_ENV)
+_events = []
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return bool(_trace_dir)
+
+
+class _NullSpan:
+    """追踪关闭时使用的空 span，所有操作均为 no-op"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """一次计时区间，退出时记录为 Chrome 'X' (complete) 事件"""
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = {k: v for k, v in args.items() if v is not None}
+
+    def set(self, **args):
+        """补充参数，如 exit_code / bytes"""
+        self.args.update({k: v for k, v in args.items() if v is not None})
+
+    def __enter__(self):
+        # 墙钟时间用于跨进程对齐，perf_counter 用于精确计算时长
+        self._ts = time.time_ns() // 1000
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        dur = int((time.perf_counter() - self._start) * 1_000_000)
+        if exc_type is not None:
+            self.args.setdefault("error", f"{exc_type.__name__}: {exc}")
+        event = {
+            "name": self.name, "cat": self.cat, "ph": "X",
+            "ts": self._ts, "dur": dur,
+            "pid": os.getpid(), "tid": threading.get_ident(),
+            "args": self.args,
+        }
+        with _lock:
+            _events.append(event)
+        return False
+
+
+def span(name: str, cat: str = "boot", **args):
+    """创建一个 span：with tracing.span("git clone", argv=cmd) as sp: ... sp.set(exit_code=0)"""
+    if not _trace_dir:
+        return _NULL_SPAN
+    return Span(name, cat, args)
+
+
+def path_bytes(path) -> int:
+    """统计文件或目录的总字节数 (仅在追踪开启时调用)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            fp = os.path.join(root, name)
+            if not os.path.islink(fp):
+                total += os.path.getsize(fp)
+    return total
+
+
+def flush() -> None:
+    """将本进程记录的事件写入追踪目录"""
+    if not _trace_dir or not _events:
+        return
+    os.makedirs(_trace_dir, exist_ok=True)
+    proc = os.path.basename(sys.argv[0]) or "python"
+    with _lock:
+        events = [{
+            "name": "process_name", "ph": "M", "pid": os.getpid(),
+            "args": {"name": " ".join([proc] + sys.argv[1:])},
+        }] + _events
+        _events.clear()
+    out = os.path.join(_trace_dir, f"trace-{proc}-{os.getpid()}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events}, f)
+
+
+def merge(trace_dir: str, output: str) -> int:
+    """合并目录下所有进程的追踪文件，返回事件数"""
+    events = []
+    for name in sorted(os.listdir(trace_dir)):
+        fp = os.path.join(trace_dir, name)
+        if not (name.startswith("trace-") and name.endswith(".json")):
+            continue
+        if os.path.abspath(fp) == os.path.abspath(output):
+            continue
+        with open(fp, "r", encoding="utf-8") as f:
+            events.extend(json.load(f).get("traceEvents", []))
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return len(events)
+
+
+if _trace_dir:
+    atexit.register(flush)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="装配流程耗时追踪工具")
+    sub = parser.add_subparsers(dest="command")
+
+    # 供 Shell 脚本使用: 以 span 包裹任意外部指令
+    p_run = sub.add_parser("run", help="在 span 中执行指令: run NAME [--bytes PATH | --bytes-before PATH] -- CMD ...")
+    p_run.add_argument("name")
+    p_run.add_argument("--bytes", metavar="PATH", help="指令结束后统计该路径的字节数 (适用于新建的目标)")
+    p_run.add_argument("--bytes-before", metavar="PATH", help="指令执行前统计该路径的字节数 (适用于迁移的源目录)")
+
+    p_merge = sub.add_parser("merge", help="合并多进程追踪文件为单个 Chrome trace JSON")
+    p_merge.add_argument("dir", nargs="?", default=_trace_dir)
+    p_merge.add_argument("-o", "--output", help="输出文件 (默认: <dir>/boot_trace.json)")
+
+    # "--" 之后的内容原样作为被追踪的指令
+    argv = sys.argv[1:]
+    cmd = argv[argv.index("--") + 1:] if "--" in argv else []
+    args = parser.parse_args(argv[:argv.index("--")] if "--" in argv else argv)
+
+    if args.command == "run":
+        if not cmd:
+            parser.error("run 需要在 -- 之后提供指令")
+        with span(args.name, cat="shell", argv=cmd) as sp:
+            if args.bytes_before and os.path.exists(args.bytes_before):
+                sp.set(bytes=path_bytes(args.bytes_before))
+            code = subprocess.call(cmd)
+            sp.set(exit_code=code)
+            if args.bytes and os.path.exists(args.bytes):
+                sp.set(bytes=path_bytes(args.bytes))
+        sys.exit(code)
+    elif args.command == "merge":
+        if not args.dir:
+            parser.error(f"未指定追踪目录，且未设置 {TRACE_ENV}")
+        output = args.output or os.path.join(args.dir, "boot_trace.json")
+        count = merge(args.dir, output)
+        print(f">>> 已合并 {count} 条追踪事件: {output}")
+    else:
+        parser.print_help()